@@ -1 +1,3 @@
-from telegram_handler.handler import TelegramLoggingHandler, TelegramFormatter
+from telegram_handler._base import BaseTelegramLoggingHandler, TelegramFormatter
+from telegram_handler.handler_async import TelegramLoggingHandler
+from telegram_handler.handler_sync import SyncTelegramLoggingHandler
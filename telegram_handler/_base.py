@@ -0,0 +1,215 @@
+import logging
+from abc import ABC, abstractmethod
+from copy import copy
+from queue import Queue, Empty, Full
+from threading import Thread, Event
+from time import strftime
+
+from telegram_handler.buffer import MessageBuffer
+from telegram_handler.consts import (
+    MAX_MESSAGE_SIZE,
+    FLUSH_INTERVAL,
+    MAX_BUFFER_SIZE,
+    API_HOST,
+    MAX_BUFFER_RECORDS,
+    FLUSH_RECORDS,
+)
+
+logger = logging.getLogger(__name__)
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+_default_formatter = logging.Formatter()
+
+
+class TelegramFormatter(logging.Formatter):
+    """TelegramFormatter."""
+
+    EMOJI_MAP = {
+        logging.DEBUG: "DEBUG: \u26aa",
+        logging.INFO: "INFO: \U0001f535",
+        logging.WARNING: "WARNING: \U0001F7E0",
+        logging.ERROR: "ERROR: \U0001F534",
+        logging.CRITICAL: "CRITICAL: \U0001f525",
+    }
+
+    def __init__(
+        self,
+        fmt: str = "%(asctime)s - %(levelname)s - %(message)s",
+        datefmt: str = None,
+        use_emoji: bool = True,
+        emoji_map: dict = None,
+    ):
+        """:fmt: str, default: '%(asctime)s - %(levelname)s - %(message)s'\n
+        :datefmt: str, default: None\n
+        :use_emoji: bool, default: True\n
+        :emoji_map: dict, default: None\n
+        """
+        super().__init__(fmt, datefmt)
+        self.use_emoji = use_emoji
+        self.emojis = dict(self.EMOJI_MAP)
+        if emoji_map:
+            self.emojis.update(emoji_map)
+        self._level_labels = self.emojis if use_emoji else {}
+        self._uses_time = super().usesTime()
+        self._time_cache = (None, None)
+        if not self._level_labels and type(self).format is TelegramFormatter.format:
+            # Nothing to relabel, skip the override on every record. Not done
+            # for subclasses overriding format(), which would be bypassed too.
+            self.format = super().format
+
+    def usesTime(self):
+        # The format string never changes, no need to search it per record
+        return self._uses_time
+
+    def formatTime(self, record, datefmt=None):
+        # Records logged within the same second share the formatted time
+        key = (int(record.created), datefmt)
+        cached_key, formatted = self._time_cache
+        if cached_key != key:
+            formatted = strftime(
+                datefmt or self.default_time_format, self.converter(key[0])
+            )
+            self._time_cache = (key, formatted)
+        if datefmt or not self.default_msec_format:
+            return formatted
+        return self.default_msec_format % (formatted, record.msecs)
+
+    def format(self, record):
+        label = self._level_labels.get(record.levelno)
+        if label is None:
+            return super().format(record)
+        # The record is shared with the other handlers, restore it afterwards
+        levelname = record.levelname
+        record.levelname = label
+        try:
+            return super().format(record)
+        finally:
+            record.levelname = levelname
+
+
+class BaseTelegramLoggingHandler(logging.Handler, ABC):
+    """Buffers log records and sends them to Telegram from a writer thread.
+
+    Subclasses implement `write`, which sends a single message.
+    """
+
+    # Messages are sent with parse_mode=HTML, where these must be escaped
+    _HTML_ESCAPE = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;"})
+
+    def __init__(self, bot_token, chat_id, level=logging.NOTSET):
+        super().__init__(level)
+        self._bot_token = bot_token
+        self.chat_id = chat_id
+        self._url = self._format_url(bot_token, chat_id)
+        self._records = Queue(MAX_BUFFER_RECORDS)
+        self._buffer = MessageBuffer(MAX_BUFFER_SIZE)
+        self._dropped = 0
+        self._reported_dropped = 0
+        self._stop_event = Event()
+        self._data_ready = Event()
+        self._writer_thread = Thread(target=self._write_manager, daemon=True)
+        self._writer_thread.start()
+
+    def emit(self, record):
+        # Formatting is left to the writer thread. The message is merged
+        # here since its arguments may change once emit() returns, and the
+        # traceback is rendered so its frames are not kept alive in the queue.
+        try:
+            prepared = copy(record)
+            prepared.msg = record.getMessage()
+            prepared.args = None
+            if record.exc_info:
+                if not record.exc_text:
+                    formatter = self.formatter or _default_formatter
+                    prepared.exc_text = formatter.formatException(record.exc_info)
+                prepared.exc_info = None
+            self._records.put_nowait(prepared)
+        except Full:
+            # handle() calls emit() with self.lock held, which guards this
+            self._dropped += 1
+            return
+        except Exception:
+            self.handleError(record)
+            return
+        # is_set() is a plain read, set() would take the Event's lock on
+        # every record until the writer thread wakes up
+        if (
+            not self._data_ready.is_set()
+            and self._records.qsize() >= FLUSH_RECORDS
+        ):
+            self._data_ready.set()
+
+    def _write_manager(self):
+        while not self._stop_event.is_set():
+            # Wakes up early when a full message is buffered or on close()
+            self._data_ready.wait(FLUSH_INTERVAL)
+            self._data_ready.clear()
+            self._send_buffered()
+        # One more pass for the records queued after the last pass took its
+        # snapshot, e.g. the ones logged right before close(). It is not
+        # repeated: records the handler logs about its own failures would
+        # be queued again on every pass when it is on the root logger.
+        self._send_buffered()
+
+    def _format_records(self):
+        for _ in range(self._records.qsize()):
+            try:
+                record = self._records.get_nowait()
+            except Empty:
+                break
+            try:
+                message = self.format(record).translate(self._HTML_ESCAPE)
+            except Exception:
+                self.handleError(record)
+                continue
+            self._buffer.write(message, "\n")
+
+    def _send_buffered(self):
+        self._format_records()
+        # Pack as many records as fit in each message and keep sending
+        # until the buffer is drained
+        while True:
+            message = self._buffer.read(MAX_MESSAGE_SIZE)
+            if not message:
+                break
+            if message.isspace():
+                # e.g. the separator left over after a record that filled
+                # a whole message, Telegram rejects empty text
+                continue
+            try:
+                self.write(message)
+            except Exception as e:
+                logger.error(f"Failed to send message: {self._redact(e)}")
+        dropped = self._dropped + self._buffer.dropped_count
+        if dropped > self._reported_dropped:
+            logger.warning(
+                f"{dropped - self._reported_dropped} records dropped "
+                "due to buffer overflow"
+            )
+            self._reported_dropped = dropped
+
+    @staticmethod
+    def _format_url(bot_token, chat_id):
+        # Public channels are addressed by name, numeric ids are kept as is
+        chat_id = str(chat_id)
+        if not chat_id.lstrip("-").isdigit() and not chat_id.startswith("@"):
+            chat_id = f"@{chat_id}"
+        return (
+            f"https://{API_HOST}/bot{bot_token}/sendMessage?"
+            f"chat_id={chat_id}&parse_mode=HTML"
+        )
+
+    def _redact(self, error):
+        # The url holds the bot token, and HTTP errors usually include it
+        return str(error).replace(self._bot_token, "<bot_token>")
+
+    @abstractmethod
+    def write(self, message):
+        """Send a single message to the chat."""
+
+    def close(self):
+        self._stop_event.set()
+        self._data_ready.set()
+        self._writer_thread.join()
+        super().close()
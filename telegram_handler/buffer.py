@@ -1,24 +1,72 @@
-from threading import Event
+from collections import deque
+from threading import Lock
+
+from telegram_handler.consts import MAX_BUFFER_SIZE
 
 
 class MessageBuffer:
-    """Buffer for storing and managing log messages."""
+    """Thread-safe buffer of log messages, read back in line-aligned chunks."""
 
-    def __init__(self, max_size):
+    def __init__(self, max_size=MAX_BUFFER_SIZE):
         self.max_size = max_size
-        self.buffer = ""
-        self.lock = Event()
+        self._chunks = deque()
+        # Number of buffered characters, len(self._chunks) counts chunks
+        self._size = 0
+        self._dropped = 0
+        self._lock = Lock()
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def dropped_count(self):
+        """Number of messages dropped because the buffer was full."""
+        return self._dropped
 
-    def write(self, message):
-        if len(self.buffer) + len(message) <= self.max_size:
-            self.buffer += message
-        else:
-            self.flush()
+    def write(self, message, suffix=""):
+        # The suffix is stored as its own chunk to avoid building a new
+        # string for every message
+        size = len(message) + len(suffix)
+        with self._lock:
+            new_size = self._size + size
+            if new_size <= self.max_size:
+                self._chunks.append(message)
+                if suffix:
+                    self._chunks.append(suffix)
+                self._size = new_size
+                return True
+            # Keep what is already buffered and drop the new message
+            self._dropped += 1
+            return False
 
     def read(self, size):
-        message = self.buffer[:size]
-        self.buffer = self.buffer[size:]
-        return message
+        parts = []
+        remaining = size
+        with self._lock:
+            chunks = self._chunks
+            while chunks and remaining > 0:
+                chunk = chunks.popleft()
+                if len(chunk) > remaining:
+                    # Prefer to split after a newline, a single line longer
+                    # than size is the only case split in the middle
+                    cut = chunk.rfind("\n", 0, remaining) + 1
+                    if not cut and parts:
+                        chunks.appendleft(chunk)
+                        break
+                    if not cut:
+                        cut = remaining
+                        # Do not cut an HTML entity such as &amp; in two
+                        amp = chunk.rfind("&", 0, cut)
+                        if amp > 0 and amp > chunk.rfind(";", 0, cut):
+                            cut = amp
+                    chunks.appendleft(chunk[cut:])
+                    chunk = chunk[:cut]
+                parts.append(chunk)
+                remaining -= len(chunk)
+            self._size -= size - remaining
+        return "".join(parts)
 
     def flush(self):
-        self.buffer = ""
+        with self._lock:
+            self._chunks.clear()
+            self._size = 0
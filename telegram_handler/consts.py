@@ -3,3 +3,15 @@ FLUSH_INTERVAL = 5
 MAX_MESSAGE_SIZE = 4000
 MAX_BUFFER_SIZE = 10**16
 CONNECTION_POOL_SIZE = 32  # Default is 8
+API_HOST = "api.telegram.org"
+MAX_RETRYS = 5
+RETRY_COOLDOWN_TIME = 1
+RETRY_BACKOFF_TIME = 2
+# (connect, read) timeouts in seconds for a single HTTP request
+REQUEST_TIMEOUT = (5, 30)
+# Telegram allows about 20 messages per minute to the same group or channel
+RATE_LIMIT = 20
+RATE_LIMIT_PERIOD = 60
+MAX_BUFFER_RECORDS = 10**6
+# Records queued before the writer thread is woken up ahead of FLUSH_INTERVAL
+FLUSH_RECORDS = 64
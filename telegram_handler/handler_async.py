@@ -0,0 +1,92 @@
+import asyncio
+import json
+import logging
+from threading import Thread
+
+import aiohttp
+from telegram_handler._base import BaseTelegramLoggingHandler, JSON_HEADERS
+from telegram_handler.consts import (
+    MAX_RETRYS,
+    RETRY_COOLDOWN_TIME,
+    REQUEST_TIMEOUT,
+    RATE_LIMIT,
+    RATE_LIMIT_PERIOD,
+)
+from telegram_handler.rate_limiter import RateLimiter
+
+logger = logging.getLogger(__name__)
+
+
+class TelegramLoggingHandler(BaseTelegramLoggingHandler):
+    """Logging handler that sends messages to a Telegram chat.
+
+    Messages are posted to the Bot API with aiohttp from an event loop that
+    lives as long as the handler, so the connection and the rate limiter
+    state are reused between messages.
+    """
+
+    def __init__(self, bot_token, chat_id, level=logging.NOTSET):
+        # Created on the event loop by the first send
+        self._session = None
+        self._rate_limiter = RateLimiter(RATE_LIMIT, RATE_LIMIT_PERIOD)
+        self._loop = asyncio.new_event_loop()
+        self._loop_thread = Thread(target=self._loop.run_forever, daemon=True)
+        self._loop_thread.start()
+        super().__init__(bot_token, chat_id, level)
+
+    def write(self, message):
+        asyncio.run_coroutine_threadsafe(
+            self.async_send_message(message), self._loop
+        ).result()
+
+    async def async_send_message(self, message):
+        if self._session is None:
+            connect_timeout, read_timeout = REQUEST_TIMEOUT
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=2, ttl_dns_cache=300),
+                timeout=aiohttp.ClientTimeout(
+                    sock_connect=connect_timeout, sock_read=read_timeout
+                ),
+            )
+        body = json.dumps({"text": message})
+        try:
+            for _ in range(MAX_RETRYS):
+                # Once close() is called the backlog is sent as fast as
+                # possible instead of blocking close() on the rate limit
+                stopping = self._stop_event.is_set()
+                if not stopping:
+                    await self._rate_limiter.acquire()
+                async with self._session.post(
+                    self._url, data=body, headers=JSON_HEADERS
+                ) as response:
+                    if response.status != 429:
+                        response.raise_for_status()
+                        return
+                    retry_after = await self._retry_after(response)
+                if stopping:
+                    break
+                # Hold off all requests for as long as Telegram asks to
+                await asyncio.sleep(retry_after)
+            logger.error("Failed to send message: too many requests")
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"Failed to send message: {self._redact(e)}")
+
+    @staticmethod
+    async def _retry_after(response):
+        try:
+            body = await response.json(content_type=None)
+            return float(body["parameters"]["retry_after"])
+        except (ValueError, KeyError, TypeError):
+            return float(response.headers.get("Retry-After", RETRY_COOLDOWN_TIME))
+
+    def close(self):
+        super().close()
+        if self._loop.is_closed():
+            return
+        if self._session is not None:
+            asyncio.run_coroutine_threadsafe(
+                self._session.close(), self._loop
+            ).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._loop_thread.join()
+        self._loop.close()
@@ -0,0 +1,68 @@
+import json
+import logging
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.exceptions import RequestException
+from telegram_handler._base import BaseTelegramLoggingHandler, JSON_HEADERS
+from telegram_handler.consts import (
+    MAX_RETRYS,
+    RETRY_COOLDOWN_TIME,
+    RETRY_BACKOFF_TIME,
+    REQUEST_TIMEOUT,
+)
+
+
+class SyncTelegramLoggingHandler(BaseTelegramLoggingHandler):
+    """Logging handler that sends messages to a Telegram chat using requests.
+
+    A single session is kept for the lifetime of the handler, so the
+    connection to the Bot API is reused between messages.
+    """
+
+    def __init__(self, bot_token, chat_id, level=logging.NOTSET):
+        self._session = requests.Session()
+        # Retries are handled by write()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=1, max_retries=0)
+        self._session.mount("https://", adapter)
+        super().__init__(bot_token, chat_id, level)
+
+    def write(self, message):
+        # Encoded once, chat_id and parse_mode are already part of the url
+        body = json.dumps({"text": message}).encode("utf-8")
+        delay = RETRY_COOLDOWN_TIME
+        for attempt in range(1, MAX_RETRYS + 1):
+            # Once close() is called a failed attempt is not retried, so
+            # close() does not block on the backoff or on a 429
+            last = attempt == MAX_RETRYS or self._stop_event.is_set()
+            try:
+                response = self._session.post(
+                    self._url, data=body, headers=JSON_HEADERS, timeout=REQUEST_TIMEOUT
+                )
+            except RequestException:
+                if last:
+                    raise
+                wait, delay = delay, delay * RETRY_BACKOFF_TIME
+            else:
+                if response.status_code == 429 and not last:
+                    # Hold off all requests for as long as Telegram asks to
+                    wait = self._retry_after(response)
+                elif response.status_code < 500 or last:
+                    # Other client errors would fail the same way again
+                    response.raise_for_status()
+                    return
+                else:
+                    wait, delay = delay, delay * RETRY_BACKOFF_TIME
+            # close() cuts the wait short
+            self._stop_event.wait(wait)
+
+    @staticmethod
+    def _retry_after(response):
+        try:
+            return float(response.json()["parameters"]["retry_after"])
+        except (ValueError, KeyError, TypeError):
+            return float(response.headers.get("Retry-After", RETRY_COOLDOWN_TIME))
+
+    def close(self):
+        super().close()
+        self._session.close()
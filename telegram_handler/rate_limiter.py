@@ -0,0 +1,28 @@
+import asyncio
+from time import monotonic
+
+
+class RateLimiter:
+    """Token bucket allowing `rate` acquisitions per `period` seconds.
+
+    Meant to be used from a single event loop, so it holds no lock.
+    """
+
+    def __init__(self, rate, period):
+        self.rate = rate
+        self.period = period
+        self._tokens = rate
+        self._updated = monotonic()
+
+    async def acquire(self):
+        while True:
+            now = monotonic()
+            self._tokens = min(
+                self.rate,
+                self._tokens + (now - self._updated) * self.rate / self.period,
+            )
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) * self.period / self.rate)
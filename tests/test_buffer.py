@@ -1,3 +1,5 @@
+from threading import Thread
+
 from telegram_handler.buffer import MessageBuffer
 
 MSG = "abcdefghijk" * 2
@@ -11,9 +13,11 @@ def test_sanity():
 
 
 def test_write_out_of_bounds():
-    buff = MessageBuffer(MSG_LEN - 10)
-    buff.write(MSG)
-    assert buff.read(MSG_LEN) == MSG[:-10]
+    buff = MessageBuffer(MSG_LEN + 10)
+    assert buff.write(MSG)
+    assert not buff.write(MSG)
+    assert buff.dropped_count == 1
+    assert buff.read(MSG_LEN * 2) == MSG
 
 
 def test_read_out_of_bounds():
@@ -26,3 +30,91 @@ def test_write_exact():
     buff = MessageBuffer(MSG_LEN)
     buff.write(MSG)
     assert buff.read(MSG_LEN) == MSG
+
+
+def test_read_across_writes():
+    buff = MessageBuffer(MSG_LEN * 3)
+    for _ in range(3):
+        buff.write(MSG)
+    assert buff.read(MSG_LEN * 2 - 1) == MSG
+    assert buff.read(MSG_LEN * 2) == MSG * 2
+
+
+def test_read_splits_on_newline():
+    line = f"{MSG}\n"
+    buff = MessageBuffer(len(line) * 3)
+    buff.write(line + line)
+    buff.write(line)
+    assert buff.read(len(line) * 2 - 1) == line
+    assert buff.read(len(line) * 2 + 5) == line + line
+
+
+def test_read_splits_long_line():
+    buff = MessageBuffer(MSG_LEN)
+    buff.write(MSG)
+    assert buff.read(5) == MSG[:5]
+    assert buff.read(MSG_LEN) == MSG[5:]
+
+
+def test_concurrent_writes():
+    writers = 8
+    buff = MessageBuffer(MSG_LEN * writers * 100)
+
+    def write_many():
+        for _ in range(100):
+            buff.write(MSG)
+
+    threads = [Thread(target=write_many) for _ in range(writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert buff.read(MSG_LEN * writers * 100) == MSG * writers * 100
+
+
+def test_write_suffix():
+    buff = MessageBuffer(MSG_LEN * 2 + 2)
+    buff.write(MSG, "\n")
+    buff.write(MSG, "\n")
+    assert buff.read(MSG_LEN * 2) == f"{MSG}\n"
+    assert buff.read(MSG_LEN * 2) == f"{MSG}\n"
+
+
+def test_concurrent_write_and_read():
+    writes = 1000
+    line = f"{MSG}\n"
+    buff = MessageBuffer(len(line) * writes)
+
+    def write_many():
+        for _ in range(writes):
+            buff.write(MSG, "\n")
+
+    writer = Thread(target=write_many)
+    writer.start()
+    received = []
+    while writer.is_alive() or len(buff):
+        received.append(buff.read(len(line) * 10))
+    writer.join()
+    assert "".join(received) == line * writes
+    assert len(buff) == 0
+
+
+def test_size_counter():
+    buff = MessageBuffer(MSG_LEN * 3)
+    buff.write(MSG, "\n")
+    buff.write(MSG)
+    assert len(buff) == MSG_LEN * 2 + 1
+    buff.read(MSG_LEN + 1)
+    assert len(buff) == MSG_LEN
+    buff.flush()
+    assert len(buff) == 0
+    assert buff.read(MSG_LEN) == ""
+
+
+def test_read_does_not_split_entity():
+    line = "a" * 5 + "&lt;b&gt;" * 3
+    buff = MessageBuffer(len(line))
+    buff.write(line)
+    assert buff.read(8) == "a" * 5
+    assert buff.read(8) == "&lt;b"
+    assert buff.read(len(line)) == "&gt;" + "&lt;b&gt;" * 2
@@ -1,5 +1,22 @@
-from telegram_handler.consts import API_HOST
-from telegram_handler import TelegramLoggingHandler
+import json
+import logging
+import sys
+from contextlib import asynccontextmanager
+from threading import Thread
+from time import monotonic, sleep
+from unittest.mock import AsyncMock, Mock, patch
+
+import aiohttp
+import pytest
+from requests.exceptions import ConnectionError, HTTPError
+
+from telegram_handler.consts import API_HOST, MAX_MESSAGE_SIZE, REQUEST_TIMEOUT
+from telegram_handler import (
+    BaseTelegramLoggingHandler,
+    TelegramLoggingHandler,
+    SyncTelegramLoggingHandler,
+    TelegramFormatter,
+)
 
 BOT_TOKEN = "FAKE_BOT_TOKEN"
 CHANNEL_NAME = "FAKE_CHANNEL_NAME"
@@ -20,3 +37,242 @@ def test_format_url_chat_id():
         handler._url == f"https://{API_HOST}/bot{BOT_TOKEN}/sendMessage?"
         f"chat_id={CHAT_ID}&parse_mode=HTML"
     )
+
+
+def test_sync_handler_posts_through_session():
+    handler = SyncTelegramLoggingHandler(BOT_TOKEN, CHAT_ID)
+    response = Mock(status_code=200)
+    with patch.object(handler._session, "post", return_value=response) as post:
+        handler.write("message")
+        handler.write("message")
+    handler.close()
+    assert post.call_count == 2
+    assert post.call_args.kwargs["timeout"] == REQUEST_TIMEOUT
+    assert json.loads(post.call_args.kwargs["data"]) == {"text": "message"}
+
+
+def test_sync_handler_retry_after():
+    response = Mock(status_code=429, headers={"Retry-After": "3"})
+    response.json.return_value = {"ok": False, "parameters": {"retry_after": 7}}
+    assert SyncTelegramLoggingHandler._retry_after(response) == 7
+    response.json.side_effect = ValueError
+    assert SyncTelegramLoggingHandler._retry_after(response) == 3
+
+
+def test_formatter_emoji():
+    formatter = TelegramFormatter("%(levelname)s %(message)s")
+    record = logging.makeLogRecord(
+        {"levelno": logging.ERROR, "levelname": "ERROR", "msg": "msg"}
+    )
+    label = TelegramFormatter.EMOJI_MAP[logging.ERROR]
+    assert formatter.format(record) == f"{label} msg"
+    assert record.levelname == "ERROR"
+
+
+def test_formatter_emoji_map_not_shared():
+    TelegramFormatter(emoji_map={logging.INFO: "INFO"})
+    assert TelegramFormatter.EMOJI_MAP[logging.INFO] == "INFO: \U0001f535"
+
+
+def test_formatter_without_emoji():
+    formatter = TelegramFormatter("%(levelname)s %(message)s", use_emoji=False)
+    record = logging.makeLogRecord(
+        {"levelno": logging.ERROR, "levelname": "ERROR", "msg": "msg"}
+    )
+    assert formatter.format(record) == "ERROR msg"
+
+
+def test_formatter_time():
+    record = logging.makeLogRecord({"msg": "msg"})
+    for datefmt in (None, "%H:%M:%S"):
+        formatter = TelegramFormatter(datefmt=datefmt)
+        expected = logging.Formatter(datefmt=datefmt).formatTime(record, datefmt)
+        assert formatter.formatTime(record, datefmt) == expected
+        assert formatter.formatTime(record, datefmt) == expected
+    assert not TelegramFormatter("%(message)s").usesTime()
+
+
+def test_sync_handler_waits_retry_after():
+    handler = SyncTelegramLoggingHandler(BOT_TOKEN, CHAT_ID)
+    too_many = Mock(status_code=429, headers={"Retry-After": "3"})
+    too_many.json.side_effect = ValueError
+    responses = [too_many, Mock(status_code=200)]
+    with patch.object(handler._session, "post", side_effect=responses) as post:
+        with patch.object(handler._stop_event, "wait") as wait:
+            handler.write("message")
+    handler.close()
+    assert post.call_count == 2
+    wait.assert_called_once_with(3.0)
+
+
+def test_sync_handler_does_not_retry_client_error():
+    handler = SyncTelegramLoggingHandler(BOT_TOKEN, CHAT_ID)
+    response = Mock(status_code=400)
+    response.raise_for_status.side_effect = HTTPError
+    with patch.object(handler._session, "post", return_value=response) as post:
+        with pytest.raises(HTTPError):
+            handler.write("message")
+    handler.close()
+    assert post.call_count == 1
+
+
+def test_records_formatted_by_writer():
+    handler = SyncTelegramLoggingHandler(BOT_TOKEN, CHAT_ID)
+    handler.setFormatter(logging.Formatter("%(levelname)s %(message)s"))
+    items = ["before"]
+    handler.handle(
+        logging.makeLogRecord({"levelname": "INFO", "msg": "%s", "args": (items,)})
+    )
+    items[0] = "after"
+    with patch.object(handler, "write") as write:
+        handler._send_buffered()
+    handler.close()
+    write.assert_called_once_with("INFO ['before']\n")
+
+
+def test_records_html_escaped():
+    handler = SyncTelegramLoggingHandler(BOT_TOKEN, CHAT_ID)
+    handler.handle(logging.makeLogRecord({"msg": "File <module> & 1 > 0"}))
+    with patch.object(handler, "write") as write:
+        handler._send_buffered()
+    handler.close()
+    write.assert_called_once_with("File &lt;module&gt; &amp; 1 &gt; 0\n")
+
+
+def test_send_error_does_not_leak_token(caplog):
+    handler = SyncTelegramLoggingHandler(BOT_TOKEN, CHAT_ID)
+    handler.handle(logging.makeLogRecord({"msg": "msg"}))
+    error = HTTPError(f"400 Client Error: Bad Request for url: {handler._url}")
+    with patch.object(handler, "write", side_effect=error):
+        handler._send_buffered()
+    handler.close()
+    assert "Failed to send message" in caplog.text
+    assert BOT_TOKEN not in caplog.text
+
+
+def test_base_handler_is_abstract():
+    with pytest.raises(TypeError):
+        BaseTelegramLoggingHandler(BOT_TOKEN, CHAT_ID)
+
+
+def test_full_size_record_sent_once():
+    handler = SyncTelegramLoggingHandler(BOT_TOKEN, CHAT_ID)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    handler.handle(logging.makeLogRecord({"msg": "a" * MAX_MESSAGE_SIZE}))
+    with patch.object(handler, "write") as write:
+        handler._send_buffered()
+    handler.close()
+    write.assert_called_once_with("a" * MAX_MESSAGE_SIZE)
+
+
+def test_formatter_subclass_without_emoji():
+    class UpperFormatter(TelegramFormatter):
+        def format(self, record):
+            return super().format(record).upper()
+
+    formatter = UpperFormatter("%(message)s", use_emoji=False)
+    assert formatter.format(logging.makeLogRecord({"msg": "msg"})) == "MSG"
+
+
+def fake_session(status, url):
+    @asynccontextmanager
+    async def post(*args, **kwargs):
+        response = Mock(status=status)
+        if status >= 400:
+            response.raise_for_status.side_effect = aiohttp.ClientResponseError(
+                Mock(real_url=url), (), status=status, message="Bad Request"
+            )
+        yield response
+
+    session = AsyncMock()
+    session.post = Mock(side_effect=post)
+    return session
+
+
+def test_async_send_error_does_not_leak_token(caplog):
+    handler = TelegramLoggingHandler(BOT_TOKEN, CHAT_ID)
+    handler._session = fake_session(400, handler._url)
+    handler.write("message")
+    handler.close()
+    assert "Failed to send message" in caplog.text
+    assert BOT_TOKEN not in caplog.text
+
+
+def test_async_close_skips_rate_limit():
+    handler = TelegramLoggingHandler(BOT_TOKEN, CHAT_ID)
+    handler._session = session = fake_session(200, handler._url)
+    handler._rate_limiter._tokens = 0
+    for _ in range(3):
+        handler.handle(logging.makeLogRecord({"msg": "a" * 3000}))
+    start = monotonic()
+    handler.close()
+    assert monotonic() - start < 1
+    assert session.post.call_count == 3
+
+
+def test_close_sends_all_records():
+    records = 1000
+    handler = SyncTelegramLoggingHandler(BOT_TOKEN, CHAT_ID)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    # A slow send keeps the writer thread busy while records are queued
+    with patch.object(handler, "write", side_effect=lambda _: sleep(0.05)) as write:
+        for i in range(records):
+            handler.handle(logging.makeLogRecord({"msg": f"record {i}"}))
+        handler.close()
+    sent = "".join(call.args[0] for call in write.call_args_list)
+    assert sent == "".join(f"record {i}\n" for i in range(records))
+
+
+def test_emit_bad_arguments():
+    handler = SyncTelegramLoggingHandler(BOT_TOKEN, CHAT_ID)
+    record = logging.makeLogRecord({"msg": "%d", "args": ("x",)})
+    with patch.object(handler, "handleError") as handle_error:
+        handler.handle(record)
+    handler.close()
+    handle_error.assert_called_once_with(record)
+
+
+def test_sync_close_skips_retry_after():
+    handler = SyncTelegramLoggingHandler(BOT_TOKEN, CHAT_ID)
+    too_many = Mock(status_code=429, headers={"Retry-After": "60"})
+    too_many.json.side_effect = ValueError
+    too_many.raise_for_status.side_effect = HTTPError
+    handler.handle(logging.makeLogRecord({"msg": "msg"}))
+    with patch.object(handler._session, "post", return_value=too_many) as post:
+        start = monotonic()
+        handler.close()
+    assert monotonic() - start < 1
+    assert post.call_count == 1
+
+
+def test_close_on_root_logger_with_failing_write():
+    handler = SyncTelegramLoggingHandler(BOT_TOKEN, CHAT_ID)
+    root = logging.getLogger()
+    root.addHandler(handler)
+    try:
+        with patch.object(handler, "write", side_effect=ConnectionError):
+            root.error("message")
+            closer = Thread(target=handler.close, daemon=True)
+            closer.start()
+            closer.join(timeout=2)
+            assert not closer.is_alive()
+            assert handler.write.call_count <= 2
+    finally:
+        root.removeHandler(handler)
+
+
+def test_emit_renders_traceback():
+    handler = SyncTelegramLoggingHandler(BOT_TOKEN, CHAT_ID)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        record = logging.makeLogRecord({"msg": "msg", "exc_info": sys.exc_info()})
+    handler.handle(record)
+    queued = handler._records.queue[0]
+    assert queued.exc_info is None
+    assert "ValueError: boom" in queued.exc_text
+    with patch.object(handler, "write") as write:
+        handler._send_buffered()
+    handler.close()
+    assert "ValueError: boom" in write.call_args.args[0]
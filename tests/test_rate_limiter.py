@@ -0,0 +1,28 @@
+import asyncio
+from time import monotonic
+
+from telegram_handler.rate_limiter import RateLimiter
+
+
+def test_burst_within_rate():
+    limiter = RateLimiter(5, 60)
+
+    async def acquire_many():
+        for _ in range(5):
+            await limiter.acquire()
+
+    start = monotonic()
+    asyncio.run(acquire_many())
+    assert monotonic() - start < 0.1
+
+
+def test_waits_for_token():
+    limiter = RateLimiter(10, 1)
+
+    async def acquire_many():
+        for _ in range(12):
+            await limiter.acquire()
+
+    start = monotonic()
+    asyncio.run(acquire_many())
+    assert monotonic() - start >= 0.15